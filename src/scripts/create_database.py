@@ -46,8 +46,12 @@ class DatabaseCreator:
         """Extract root module name from full module name"""
         return module_name.split(".")[0] if "." in module_name else module_name
 
-    def create_schema(self):
-        """Create database schema with FTS5 tables"""
+    def create_schema(self, fts_triggers: bool = True):
+        """Create database schema with FTS5 tables
+
+        Pass fts_triggers=False to defer the FTS5 sync triggers, e.g. when
+        bulk loading data and rebuilding the FTS5 indexes afterwards.
+        """
         self.log("Creating database schema...")
 
         assert self.conn is not None
@@ -168,9 +172,19 @@ class DatabaseCreator:
             )
         """)
 
-        # Create triggers to keep FTS5 tables in sync
+        if fts_triggers:
+            self.create_fts_triggers()
+
+        assert self.conn is not None
+        self.conn.commit()
+
+    def create_fts_triggers(self):
+        """Create triggers that keep the FTS5 tables in sync with their content tables"""
         self.log("Creating FTS5 sync triggers...")
 
+        assert self.conn is not None
+        cursor = self.conn.cursor()
+
         # Classes FTS triggers
         cursor.execute("""
             CREATE TRIGGER IF NOT EXISTS classes_ai AFTER INSERT ON classes BEGIN
@@ -219,8 +233,14 @@ class DatabaseCreator:
             END
         """)
 
+    def rebuild_fts_indexes(self):
+        """Rebuild the FTS5 indexes from their content tables in one pass"""
+        self.log("Rebuilding FTS5 search indexes...")
         assert self.conn is not None
-        self.conn.commit()
+
+        with self.conn:
+            self.conn.execute("INSERT INTO classes_fts(classes_fts) VALUES('rebuild')")
+            self.conn.execute("INSERT INTO functions_fts(functions_fts) VALUES('rebuild')")
 
     def insert_module(self, module_data: dict[str, Any]) -> int:
         """Insert a module and return its ID"""
@@ -272,14 +292,13 @@ class DatabaseCreator:
         self.log(f"    Inserted class: {class_data['name']} (ID: {class_id})")
 
         # Insert inheritance
-        for base in class_data.get("bases", []):
-            cursor.execute(
-                """
-                INSERT INTO class_inheritance (class_id, base_class_name)
-                VALUES (?, ?)
-            """,
-                (class_id, base),
-            )
+        cursor.executemany(
+            """
+            INSERT INTO class_inheritance (class_id, base_class_name)
+            VALUES (?, ?)
+        """,
+            [(class_id, base) for base in class_data.get("bases", [])],
+        )
 
         # Insert methods
         for method_data in class_data.get("methods", []):
@@ -322,14 +341,14 @@ class DatabaseCreator:
         self.log(f"      Inserted {func_type}: {func_data['name']} (ID: {function_id})")
 
         # Insert parameters
-        for position, param_data in enumerate(func_data.get("parameters", [])):
-            cursor.execute(
-                """
-                INSERT INTO parameters (
-                    function_id, name, kind, annotation, default_value, position
-                )
-                VALUES (?, ?, ?, ?, ?, ?)
-            """,
+        cursor.executemany(
+            """
+            INSERT INTO parameters (
+                function_id, name, kind, annotation, default_value, position
+            )
+            VALUES (?, ?, ?, ?, ?, ?)
+        """,
+            [
                 (
                     function_id,
                     param_data["name"],
@@ -337,8 +356,10 @@ class DatabaseCreator:
                     param_data.get("annotation"),
                     param_data.get("default"),
                     position,
-                ),
-            )
+                )
+                for position, param_data in enumerate(func_data.get("parameters", []))
+            ],
+        )
 
     def populate_database(self, data: dict[str, Any]):
         """Populate database from introspection data"""
@@ -417,12 +438,17 @@ class DatabaseCreator:
         self.conn.execute("PRAGMA foreign_keys = ON")
 
         try:
-            # Create schema
-            self.create_schema()
+            # Create schema, deferring FTS5 triggers until the bulk load is done
+            self.create_schema(fts_triggers=False)
 
             # Populate data
             self.populate_database(json_data)
 
+            # Build FTS5 indexes in one pass, then keep them in sync from here on
+            self.rebuild_fts_indexes()
+            self.create_fts_triggers()
+            self.conn.commit()
+
             # Print statistics
             self.print_statistics()
 
@@ -10,16 +10,22 @@ Example:
 """
 
 import argparse
+import heapq
 import json
 import random
 import sqlite3
 import sys
 from pathlib import Path
 
+SHUFFLE_SEED = 42
 
-def export_entities(db_path: str) -> list[dict]:
-    """Export all entities (classes and functions) from database"""
-    conn = sqlite3.connect(db_path)
+
+def export_entities(db_path: str, uri: bool = False) -> list[dict]:
+    """Export all entities (classes and functions) from database
+
+    Pass uri=True to treat db_path as an SQLite URI (e.g. a shared-cache in-memory database).
+    """
+    conn = sqlite3.connect(db_path, uri=uri)
     conn.row_factory = sqlite3.Row
 
     cursor = conn.execute("""
@@ -35,30 +41,37 @@ def export_entities(db_path: str) -> list[dict]:
     return entities
 
 
-def divide_entities(entities: list[dict], num_groups: int = 10) -> list[list[dict]]:
-    """Divide entities into equal groups with shuffling for even distribution"""
-    # Shuffle to distribute different types evenly
+def divide_entities(
+    entities: list[dict], num_groups: int = 10, weight_key: str | None = None
+) -> list[list[dict]]:
+    """Divide entities into equal groups with shuffling for even distribution
+
+    With weight_key, balance the summed entity[weight_key] per group instead of the counts.
+    """
+    if weight_key is not None:
+        return _divide_weighted(entities, num_groups, weight_key)
+
+    # Shuffle to distribute different types evenly; a private RNG keeps it reproducible
+    # without reseeding the global random module
     shuffled = entities.copy()
-    random.seed(42)  # For reproducibility
-    random.shuffle(shuffled)
+    random.Random(SHUFFLE_SEED).shuffle(shuffled)
 
-    # Calculate group sizes
-    total = len(shuffled)
-    base_size = total // num_groups
-    remainder = total % num_groups
+    # Group i spans shuffled[bounds[i]:bounds[i + 1]]; the first 'remainder' groups get 1 extra
+    base_size, remainder = divmod(len(shuffled), num_groups)
+    bounds = [i * base_size + min(i, remainder) for i in range(num_groups + 1)]
 
-    groups = []
-    start_idx = 0
+    return [shuffled[bounds[i] : bounds[i + 1]] for i in range(num_groups)]
 
-    for i in range(num_groups):
-        # Add 1 extra entity to first 'remainder' groups
-        group_size = base_size + (1 if i < remainder else 0)
-        end_idx = start_idx + group_size
 
-        group = shuffled[start_idx:end_idx]
-        groups.append(group)
+def _divide_weighted(entities: list[dict], num_groups: int, weight_key: str) -> list[list[dict]]:
+    """Greedy largest-first partition: each entity goes to the currently lightest group"""
+    groups: list[list[dict]] = [[] for _ in range(num_groups)]
+    heap = [(0, i) for i in range(num_groups)]  # (total weight, group index)
 
-        start_idx = end_idx
+    for entity in sorted(entities, key=lambda e: e[weight_key], reverse=True):
+        total, i = heapq.heappop(heap)
+        groups[i].append(entity)
+        heapq.heappush(heap, (total + entity[weight_key], i))
 
     return groups
 
@@ -95,8 +108,7 @@ def main():
 
     for i, group in enumerate(groups, 1):
         filename = output_dir / f"entity_group_{i}.json"
-        with open(filename, "w") as f:
-            json.dump(group, f, indent=2)
+        filename.write_text(json.dumps(group, indent=2))
         print(f"Group {i}: {len(group)} entities -> {filename}")
 
     print(f"\nTotal entities: {sum(len(g) for g in groups)}")
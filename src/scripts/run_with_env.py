@@ -15,9 +15,9 @@ import sys
 from pathlib import Path
 
 
-def detect_environment():
-    """Detect which dependency manager is being used"""
-    cwd = Path.cwd()
+def detect_environment(root: Path | None = None):
+    """Detect which dependency manager is being used in root (default: current directory)"""
+    cwd = Path.cwd() if root is None else Path(root)
 
     # Check for uv
     if (cwd / "uv.lock").exists():
@@ -49,9 +49,9 @@ def detect_environment():
     return "python"
 
 
-def run_script(script_path: str, args: list[str]):
-    """Run script with appropriate environment manager"""
-    env_type = detect_environment()
+def run_script(script_path: str, args: list[str], cwd: Path | None = None):
+    """Run script with appropriate environment manager, from cwd if given"""
+    env_type = detect_environment(cwd)
 
     if env_type == "uv":
         # Use --no-project to avoid build issues with pyproject.toml
@@ -69,7 +69,7 @@ def run_script(script_path: str, args: list[str]):
     print(f"[run_with_env] Running: {' '.join(cmd)}", file=sys.stderr)
     print("", file=sys.stderr)
 
-    result = subprocess.run(cmd)
+    result = subprocess.run(cmd, cwd=cwd)
     sys.exit(result.returncode)
 
 
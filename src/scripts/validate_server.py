@@ -19,19 +19,67 @@ Usage:
 """
 
 import argparse
+import contextlib
+import importlib.util
+import os
+import signal
 import subprocess
 import sys
 import time
 from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+# Server attributes the validator inspects
+REQUIRED_ATTRS = ("app", "search_api", "get_class_info", "get_function_info")
+OPTIONAL_ATTRS = ("list_classes", "DB_PATH", "get_db_connection")
+
+IS_UNIX = os.name != "nt"
 
 
 class ServerValidator:
     """Validates MCP server implementation"""
 
-    def __init__(self, server_path: str, verbose: bool = False):
+    def __init__(self, server_path: str | os.PathLike[str], verbose: bool = False):
         self.server_path = Path(server_path)
         self.verbose = verbose
         self.test_results = []
+        self._db_conn = None
+        self._module: ModuleType | None = None
+        self._tools_cache: dict[str, Any] | None = None
+
+    def _load_module(self) -> ModuleType | None:
+        """Import the server module once and cache it"""
+        if self._module is None:
+            spec = importlib.util.spec_from_file_location("server", self.server_path)
+            if not spec or not spec.loader:
+                return None
+
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self._module = module
+        return self._module
+
+    def _tools(self) -> dict[str, Any]:
+        """Look up the server attributes once, mapping missing ones to None"""
+        if self._tools_cache is None:
+            module = self._load_module()
+            self._tools_cache = {
+                name: getattr(module, name, None) for name in REQUIRED_ATTRS + OPTIONAL_ATTRS
+            }
+        return self._tools_cache
+
+    def _get_conn(self, module):
+        """Return the shared database connection, opening it on first use"""
+        if self._db_conn is None:
+            self._db_conn = module.get_db_connection()
+        return self._db_conn
+
+    def close(self):
+        """Close the shared database connection if one was opened"""
+        if self._db_conn is not None:
+            self._db_conn.close()
+            self._db_conn = None
 
     def log(self, message: str, level: str = "INFO"):
         """Log message"""
@@ -46,13 +94,7 @@ class ServerValidator:
         self.log("Testing server import...")
 
         try:
-            # Try to import as a module
-            import importlib.util
-
-            spec = importlib.util.spec_from_file_location("server", self.server_path)
-            if spec and spec.loader:
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
+            if self._load_module() is not None:
                 self.log("Server imports successfully", "SUCCESS")
                 return True
             else:
@@ -67,12 +109,13 @@ class ServerValidator:
         self.log(f"Testing server startup (timeout: {timeout}s)...")
 
         try:
-            # Start server process
+            # Start server process in its own session so the whole group can be killed
             process = subprocess.Popen(
                 [sys.executable, str(self.server_path)],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
+                start_new_session=IS_UNIX,
             )
 
             # Wait briefly to see if it crashes
@@ -86,7 +129,7 @@ class ServerValidator:
                     return False
             except subprocess.TimeoutExpired:
                 # Server is still running - this is good!
-                process.kill()
+                self._kill_process(process)
                 self.log("Server started successfully", "SUCCESS")
                 return True
 
@@ -96,25 +139,30 @@ class ServerValidator:
             self.log(f"Startup test failed: {e}", "ERROR")
             return False
 
+    @staticmethod
+    def _kill_process(process: subprocess.Popen):
+        """Kill a server process along with any children it spawned, then reap it"""
+        if IS_UNIX:
+            with contextlib.suppress(ProcessLookupError):  # Already exited
+                os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+        else:
+            process.kill()
+
+        with contextlib.suppress(subprocess.TimeoutExpired):
+            process.communicate(timeout=1)
+
     def test_basic_functionality(self) -> bool:
         """Test basic server functionality"""
         self.log("Testing basic functionality...")
 
         # This is a simplified test - in production you'd use MCP client library
         try:
-            # Check if server has required attributes
-            import importlib.util
-
-            spec = importlib.util.spec_from_file_location("server", self.server_path)
-            if not spec or not spec.loader:
+            if self._load_module() is None:
                 return False
 
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-
             # Check for required functions/objects
-            required_attrs = ["app", "search_api", "get_class_info", "get_function_info"]
-            missing = [attr for attr in required_attrs if not hasattr(module, attr)]
+            tools = self._tools()
+            missing = [attr for attr in REQUIRED_ATTRS if tools.get(attr) is None]
 
             if missing:
                 self.log(f"Missing required attributes: {', '.join(missing)}", "ERROR")
@@ -132,27 +180,24 @@ class ServerValidator:
         self.log("Testing database connection...")
 
         try:
-            import importlib.util
-
-            spec = importlib.util.spec_from_file_location("server", self.server_path)
-            if not spec or not spec.loader:
+            module = self._load_module()
+            if module is None:
                 return False
 
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            tools = self._tools()
 
             # Check if DB_PATH exists
-            if hasattr(module, "DB_PATH"):
-                db_path = Path(module.DB_PATH)
+            db_path_value = tools.get("DB_PATH")
+            if db_path_value is not None:
+                db_path = Path(db_path_value)
                 if not db_path.exists():
                     self.log(f"Database not found: {db_path}", "ERROR")
                     return False
 
                 # Try to connect
-                if hasattr(module, "get_db_connection"):
+                if tools.get("get_db_connection") is not None:
                     try:
-                        conn = module.get_db_connection()
-                        conn.close()
+                        self._get_conn(module)
                         self.log("Database connection successful", "SUCCESS")
                         return True
                     except Exception as e:
@@ -177,27 +222,23 @@ class ServerValidator:
             test_queries = ["test", "Graph", "layout"]
 
         try:
-            import importlib.util
-
-            spec = importlib.util.spec_from_file_location("server", self.server_path)
-            if not spec or not spec.loader:
+            if self._load_module() is None:
                 return False
 
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-
+            tools = self._tools()
             all_passed = True
 
             # Test search_api
-            if hasattr(module, "search_api"):
+            search_api = tools.get("search_api")
+            if search_api is not None:
                 for query in test_queries[:1]:  # Test first query
                     try:
-                        start = time.time()
-                        result = module.search_api(query, limit=5)
-                        duration = time.time() - start
+                        start = time.perf_counter_ns()
+                        result = search_api(query, limit=5)
+                        duration_ms = (time.perf_counter_ns() - start) / 1e6
 
                         if result and "No results found" not in result:
-                            self.log(f"search_api('{query}'): ✓ ({duration:.2f}s)", "SUCCESS")
+                            self.log(f"search_api('{query}'): ✓ ({duration_ms:.1f}ms)", "SUCCESS")
                         else:
                             self.log(f"search_api('{query}'): No results", "WARNING")
                     except Exception as e:
@@ -205,16 +246,17 @@ class ServerValidator:
                         all_passed = False
 
             # Test get_class_info
-            if hasattr(module, "get_class_info"):
+            get_class_info = tools.get("get_class_info")
+            if get_class_info is not None:
                 try:
-                    start = time.time()
-                    result = module.get_class_info(
+                    start = time.perf_counter_ns()
+                    result = get_class_info(
                         test_queries[1] if len(test_queries) > 1 else "TestClass"
                     )
-                    duration = time.time() - start
+                    duration_ms = (time.perf_counter_ns() - start) / 1e6
 
                     if result and "not found" not in result.lower():
-                        self.log(f"get_class_info: ✓ ({duration:.2f}s)", "SUCCESS")
+                        self.log(f"get_class_info: ✓ ({duration_ms:.1f}ms)", "SUCCESS")
                     else:
                         self.log("get_class_info: Class not found (expected for test)", "WARNING")
                 except Exception as e:
@@ -222,14 +264,15 @@ class ServerValidator:
                     all_passed = False
 
             # Test list_classes
-            if hasattr(module, "list_classes"):
+            list_classes = tools.get("list_classes")
+            if list_classes is not None:
                 try:
-                    start = time.time()
-                    result = module.list_classes(limit=10)
-                    duration = time.time() - start
+                    start = time.perf_counter_ns()
+                    result = list_classes(limit=10)
+                    duration_ms = (time.perf_counter_ns() - start) / 1e6
 
                     if result and "Classes" in result:
-                        self.log(f"list_classes: ✓ ({duration:.2f}s)", "SUCCESS")
+                        self.log(f"list_classes: ✓ ({duration_ms:.1f}ms)", "SUCCESS")
                     else:
                         self.log("list_classes: Unexpected result", "WARNING")
                 except Exception as e:
@@ -247,27 +290,25 @@ class ServerValidator:
         self.log("Testing error handling...")
 
         try:
-            import importlib.util
-
-            spec = importlib.util.spec_from_file_location("server", self.server_path)
-            if not spec or not spec.loader:
+            if self._load_module() is None:
                 return False
 
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            tools = self._tools()
 
             # Test with invalid class name
-            if hasattr(module, "get_class_info"):
-                result = module.get_class_info("NonExistentClass12345")
+            get_class_info = tools.get("get_class_info")
+            if get_class_info is not None:
+                result = get_class_info("NonExistentClass12345")
                 if "not found" in result.lower():
                     self.log("Error handling for invalid class: ✓", "SUCCESS")
                 else:
                     self.log("Error handling unclear", "WARNING")
 
             # Test with empty query
-            if hasattr(module, "search_api"):
+            search_api = tools.get("search_api")
+            if search_api is not None:
                 try:
-                    result = module.search_api("", limit=5)
+                    result = search_api("", limit=5)
                     # Should either handle gracefully or return no results
                     self.log("Error handling for empty query: ✓", "SUCCESS")
                 except Exception:
@@ -297,13 +338,16 @@ class ServerValidator:
         }
 
         results = {}
-        for test_name, test_func in tests.items():
-            try:
-                results[test_name] = test_func()
-            except Exception as e:
-                self.log(f"{test_name} raised exception: {e}", "ERROR")
-                results[test_name] = False
-            print()  # Blank line between tests
+        try:
+            for test_name, test_func in tests.items():
+                try:
+                    results[test_name] = test_func()
+                except Exception as e:
+                    self.log(f"{test_name} raised exception: {e}", "ERROR")
+                    results[test_name] = False
+                print()  # Blank line between tests
+        finally:
+            self.close()
 
         return results
 
@@ -10,14 +10,18 @@ Example:
 """
 
 import argparse
+import os
 import sqlite3
 import sys
 from pathlib import Path
 
 
-def verify_coverage(db_path: str) -> dict:
-    """Check coverage statistics for examples"""
-    conn = sqlite3.connect(db_path)
+def verify_coverage(db_path: str | os.PathLike[str], uri: bool = False) -> dict:
+    """Check coverage statistics for examples
+
+    Pass uri=True to treat db_path as an SQLite URI (e.g. a shared-cache in-memory database).
+    """
+    conn = sqlite3.connect(db_path, uri=uri)
 
     # Get counts
     stats = {}
@@ -149,7 +153,7 @@ def main():
         print(f"Error: Database not found at {db_path}")
         return 1
 
-    stats = verify_coverage(str(db_path))
+    stats = verify_coverage(db_path)
     print_report(stats)
 
     return 0
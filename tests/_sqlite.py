@@ -0,0 +1,44 @@
+"""SQLite helpers shared by conftest.py and the test modules."""
+
+import os
+import sqlite3
+
+_INSERT_SEED_CLASS = "INSERT INTO classes (name, full_qualified_name) VALUES (?, ?)"
+_INSERT_SEED_FUNCTION = "INSERT INTO functions (name, full_qualified_name) VALUES (?, ?)"
+
+
+def open_test_db(
+    path: str | os.PathLike[str], isolation_level: str | None = None
+) -> sqlite3.Connection:
+    """Open a file-backed test database tuned for fast writes (no durability needed).
+
+    Defaults to autocommit; pass isolation_level="" to have ``with conn:`` batch writes into
+    one transaction.
+    """
+    conn = sqlite3.connect(path, isolation_level=isolation_level)
+    conn.executescript("""
+        PRAGMA journal_mode=MEMORY;
+        PRAGMA synchronous=OFF;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA locking_mode=EXCLUSIVE;
+    """)
+    return conn
+
+
+def seed_entity_db(conn: sqlite3.Connection, class_rows=(), function_rows=()):
+    """Create the classes/functions tables on conn and bulk-insert the given rows."""
+    conn.executescript("""
+        CREATE TABLE classes (
+            id INTEGER PRIMARY KEY,
+            name TEXT,
+            full_qualified_name TEXT
+        );
+        CREATE TABLE functions (
+            id INTEGER PRIMARY KEY,
+            name TEXT,
+            full_qualified_name TEXT
+        );
+    """)
+    with conn:
+        conn.executemany(_INSERT_SEED_CLASS, class_rows)
+        conn.executemany(_INSERT_SEED_FUNCTION, function_rows)
@@ -1,16 +1,134 @@
 """Pytest configuration and shared fixtures."""
 
 import json
-import sys
+import shutil
+import sqlite3
 import tempfile
+import uuid
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
 import pytest
 
-# Add scripts directory to path
-SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
-sys.path.insert(0, str(SCRIPTS_DIR))
+from tests._sqlite import open_test_db, seed_entity_db
+
+# Sample introspection data shared (read-only) by all tests
+_SAMPLE = {
+    "name": "test_module",
+    "docstring": "A test module for validation",
+    "classes": [
+        {
+            "name": "TestClass",
+            "qualified_name": "test_module.TestClass",
+            "docstring": "A test class",
+            "bases": ["object"],
+            "module_name": "test_module",
+            "methods": [
+                {
+                    "name": "test_method",
+                    "qualified_name": "test_module.TestClass.test_method",
+                    "signature_string": "(self, x: int) -> str",
+                    "docstring": "A test method",
+                    "parameters": [
+                        {"name": "self", "kind": "POSITIONAL_OR_KEYWORD"},
+                        {
+                            "name": "x",
+                            "kind": "POSITIONAL_OR_KEYWORD",
+                            "annotation": "int",
+                        },
+                    ],
+                    "return_annotation": "str",
+                    "is_async": False,
+                    "is_classmethod": False,
+                    "is_staticmethod": False,
+                    "class_name": "TestClass",
+                    "module_name": "test_module",
+                }
+            ],
+        }
+    ],
+    "functions": [
+        {
+            "name": "test_function",
+            "qualified_name": "test_module.test_function",
+            "signature_string": "(a: str, b: int = 5) -> bool",
+            "docstring": "A test function",
+            "parameters": [
+                {"name": "a", "kind": "POSITIONAL_OR_KEYWORD", "annotation": "str"},
+                {
+                    "name": "b",
+                    "kind": "POSITIONAL_OR_KEYWORD",
+                    "annotation": "int",
+                    "default": "5",
+                },
+            ],
+            "return_annotation": "bool",
+            "is_async": False,
+            "is_classmethod": False,
+            "is_staticmethod": False,
+            "module_name": "test_module",
+        }
+    ],
+    "submodules": [],
+}
+
+SAMPLE_MODULE_DATA = MappingProxyType(_SAMPLE)
+
+
+def _schedule_rank(item: pytest.Item) -> int:
+    """Rank putting slow tests first, then integration tests, then everything else."""
+    if item.get_closest_marker("slow"):
+        return 0
+    if item.get_closest_marker("integration"):
+        return 1
+    return 2
+
+
+def pytest_collection_modifyitems(items):
+    """Run files with expensive tests first so xdist starts them early.
+
+    Each file is ranked by its most expensive test and its tests are kept contiguous, so
+    module-scoped fixtures are built once per file. xdist hands out files in the order it
+    first sees them; the sort is stable within a rank.
+
+    --ff (in addopts) reorders after this hook, moving last run's failures to the front.
+    Under --dist loadfile each file still runs whole on one worker, but a serial run (-n 0)
+    after failures splits the affected files and rebuilds their module-scoped fixtures;
+    pass --cache-clear to drop the failure history and keep files together.
+    """
+    file_rank: dict[Path, int] = {}
+    for item in items:
+        file_rank[item.path] = min(file_rank.get(item.path, 2), _schedule_rank(item))
+
+    # Sort by (file rank, first-seen file position) to keep each file's tests together
+    file_order = {path: i for i, path in enumerate(file_rank)}
+    items.sort(key=lambda item: (file_rank[item.path], file_order[item.path]))
+
+
+@pytest.fixture(scope="session")
+def create_full_mcp_server_mod():
+    """The create_full_mcp_server script module, imported once per session."""
+    import create_full_mcp_server
+
+    return create_full_mcp_server
+
+
+@pytest.fixture(scope="session")
+def json_module_info():
+    """Introspection result for the stdlib json module (max_depth=1), computed once per session."""
+    from src.scripts.introspect import ModuleIntrospector
+
+    return ModuleIntrospector(include_private=False, max_depth=1).introspect_module(json)
+
+
+@pytest.fixture(scope="session")
+def verify_coverage_mod():
+    """The verify_coverage script module, imported once per session."""
+    import verify_coverage
+
+    return verify_coverage
 
 
 @pytest.fixture
@@ -20,67 +138,10 @@ def temp_dir():
         yield Path(tmpdir)
 
 
-@pytest.fixture
-def sample_module_data() -> dict[str, Any]:
-    """Sample introspection data for testing."""
-    return {
-        "name": "test_module",
-        "docstring": "A test module for validation",
-        "classes": [
-            {
-                "name": "TestClass",
-                "qualified_name": "test_module.TestClass",
-                "docstring": "A test class",
-                "bases": ["object"],
-                "module_name": "test_module",
-                "methods": [
-                    {
-                        "name": "test_method",
-                        "qualified_name": "test_module.TestClass.test_method",
-                        "signature_string": "(self, x: int) -> str",
-                        "docstring": "A test method",
-                        "parameters": [
-                            {"name": "self", "kind": "POSITIONAL_OR_KEYWORD"},
-                            {
-                                "name": "x",
-                                "kind": "POSITIONAL_OR_KEYWORD",
-                                "annotation": "int",
-                            },
-                        ],
-                        "return_annotation": "str",
-                        "is_async": False,
-                        "is_classmethod": False,
-                        "is_staticmethod": False,
-                        "class_name": "TestClass",
-                        "module_name": "test_module",
-                    }
-                ],
-            }
-        ],
-        "functions": [
-            {
-                "name": "test_function",
-                "qualified_name": "test_module.test_function",
-                "signature_string": "(a: str, b: int = 5) -> bool",
-                "docstring": "A test function",
-                "parameters": [
-                    {"name": "a", "kind": "POSITIONAL_OR_KEYWORD", "annotation": "str"},
-                    {
-                        "name": "b",
-                        "kind": "POSITIONAL_OR_KEYWORD",
-                        "annotation": "int",
-                        "default": "5",
-                    },
-                ],
-                "return_annotation": "bool",
-                "is_async": False,
-                "is_classmethod": False,
-                "is_staticmethod": False,
-                "module_name": "test_module",
-            }
-        ],
-        "submodules": [],
-    }
+@pytest.fixture(scope="session")
+def sample_module_data() -> Mapping[str, Any]:
+    """Sample introspection data for testing (read-only; deepcopy before mutating)."""
+    return SAMPLE_MODULE_DATA
 
 
 @pytest.fixture
@@ -88,38 +149,118 @@ def sample_json_file(temp_dir, sample_module_data):
     """Create a sample JSON file with introspection data."""
     json_path = temp_dir / "sample_data.json"
     with open(json_path, "w") as f:
-        json.dump(sample_module_data, f, indent=2)
+        json.dump(dict(sample_module_data), f, indent=2)
     return json_path
 
 
-@pytest.fixture
-def sample_database(temp_dir, sample_json_file):
-    """Create a sample SQLite database."""
-    db_path = temp_dir / "test.db"
+@pytest.fixture(scope="session")
+def _sample_database_template(tmp_path_factory, sample_module_data):
+    """Build the sample SQLite database once per session."""
+    db_path = tmp_path_factory.mktemp("db_tpl") / "test.db"
 
     # Import and use create_database functionality
     from src.scripts.create_database import DatabaseCreator
 
     creator = DatabaseCreator(str(db_path), verbose=False)
+    creator.create(sample_module_data)
 
-    # Load JSON data
-    with open(sample_json_file) as f:
-        data = json.load(f)
+    return db_path
 
-    creator.create(data)
 
+@pytest.fixture
+def sample_database(temp_dir, _sample_database_template):
+    """Create a sample SQLite database (a private copy of the session template)."""
+    db_path = temp_dir / "test.db"
+    shutil.copy(_sample_database_template, db_path)
     return db_path
 
 
-@pytest.fixture
-def sample_server_dir(temp_dir, sample_database):
-    """Create a sample MCP server directory."""
-    server_dir = temp_dir / "mcp_server"
+@pytest.fixture(scope="session")
+def generated_server(tmp_path_factory, _sample_database_template):
+    """Generate the sample MCP server once per session (treat as read-only)."""
+    server_dir = tmp_path_factory.mktemp("srv") / "mcp_server"
     server_dir.mkdir()
 
-    # Import and use create_mcp_server functionality
     from src.scripts.create_mcp_server import create_mcp_server
 
-    create_mcp_server("test_module", str(sample_database), str(server_dir))
+    create_mcp_server("test_module", str(_sample_database_template), str(server_dir))
 
     return server_dir
+
+
+def _entity_rows(*names: str) -> tuple[tuple[str, str], ...]:
+    """(name, full_qualified_name) rows ready for executemany."""
+    return tuple((name, f"module.{name}") for name in names)
+
+
+# Precomputed (class rows, function rows) for each seeded divide_entities database size
+SEED_DB_SPECS = {
+    "empty": ((), ()),
+    "small": (_entity_rows("TestClass"), _entity_rows("test_func")),
+    "medium": (
+        _entity_rows(*(f"Class{i}" for i in range(5))),
+        _entity_rows(*(f"func{i}" for i in range(5))),
+    ),
+    "realistic": (
+        _entity_rows(*(f"Class{i}" for i in range(44))),
+        _entity_rows(*(f"function{i}" for i in range(177))),
+    ),
+}
+
+
+@pytest.fixture(scope="session")
+def _seed_db_templates():
+    """Build one in-memory seeded entity database per SEED_DB_SPECS size, once per session."""
+    templates = {}
+    for size, (class_rows, function_rows) in SEED_DB_SPECS.items():
+        templates[size] = sqlite3.connect(":memory:")
+        seed_entity_db(templates[size], class_rows, function_rows)
+
+    yield templates
+
+    for conn in templates.values():
+        conn.close()
+
+
+@pytest.fixture
+def seed_db(request, tmp_path, _seed_db_templates):
+    """Write a seeded entity database to tmp_path/test.db.
+
+    Pick the size with indirect parametrization, e.g.
+    ``@pytest.mark.parametrize("seed_db", ["small"], indirect=True)``; defaults to "medium".
+    """
+    size = getattr(request, "param", "medium")
+    db_path = tmp_path / "test.db"
+
+    # Page-level copy of the template via the SQLite backup API
+    dst = open_test_db(db_path)
+    _seed_db_templates[size].backup(dst)
+    dst.close()
+    return db_path
+
+
+@pytest.fixture
+def seed_db_uri(request, _seed_db_templates):
+    """Load a seeded entity database into a shared-cache in-memory database and yield its URI.
+
+    Sized like seed_db; pass the URI to code under test with ``uri=True``.
+    """
+    size = getattr(request, "param", "medium")
+    uri = f"file:memdb_{uuid.uuid4().hex}?mode=memory&cache=shared"
+
+    # The in-memory database lives as long as at least one connection to it is open
+    keeper = sqlite3.connect(uri, uri=True)
+    _seed_db_templates[size].backup(keeper)
+
+    yield uri
+    keeper.close()
+
+
+@pytest.fixture(scope="module")
+def validator(generated_server):
+    """ServerValidator for the sample server, shared by a test module and closed afterwards."""
+    from src.scripts.validate_server import ServerValidator
+
+    validator = ServerValidator(generated_server / "server.py", verbose=False)
+    yield validator
+    validator.close()
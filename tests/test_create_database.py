@@ -195,6 +195,28 @@ class TestDatabaseCreator:
 
         conn.close()
 
+    @pytest.mark.integration
+    def test_fts_triggers_created_after_bulk_load(self, temp_dir, sample_module_data):
+        """Test that FTS5 sync triggers are in place once bulk loading finishes."""
+        db_path = temp_dir / "test.db"
+        creator = DatabaseCreator(str(db_path), verbose=False)
+        creator.create(sample_module_data)
+
+        conn = sqlite3.connect(str(db_path))
+
+        cursor = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='trigger'")
+        assert cursor.fetchone()[0] == 6
+
+        # Rows inserted after creation are picked up by the triggers
+        conn.execute(
+            "INSERT INTO classes (name, full_qualified_name, docstring, module_id) "
+            "VALUES ('LateClass', 'test_module.LateClass', 'Added later', 1)"
+        )
+        cursor = conn.execute("SELECT rowid FROM classes_fts WHERE classes_fts MATCH 'LateClass'")
+        assert cursor.fetchone() is not None
+
+        conn.close()
+
 
 class TestDatabaseStatistics:
     """Tests for database statistics functionality."""
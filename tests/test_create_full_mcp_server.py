@@ -3,92 +3,94 @@ Tests for create_full_mcp_server.py
 """
 
 import json
-import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
 
-# Import the module
-sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "scripts"))
-from create_full_mcp_server import (
-    create_mcp_config_template,
-    detect_environment,
-    run_phase,
+# MCP tools every generated server exposes
+_EXPECTED_TOOLS = (
+    "search_api",
+    "get_class_info",
+    "get_function_info",
+    "list_classes",
+    "list_functions",
+    "get_parameters",
+    "find_examples",
+    "get_related",
 )
 
 
 class TestDetectEnvironment:
     """Test environment detection logic"""
 
-    def test_detect_uv_with_lock(self, tmp_path, monkeypatch):
+    def test_detect_uv_with_lock(self, tmp_path, monkeypatch, create_full_mcp_server_mod):
         """Test UV detection with uv.lock file"""
         monkeypatch.chdir(tmp_path)
         (tmp_path / "uv.lock").touch()
 
-        result = detect_environment()
+        result = create_full_mcp_server_mod.detect_environment()
         assert result == ["uv", "run", "--no-project", "python"]
 
-    def test_detect_poetry_with_lock(self, tmp_path, monkeypatch):
+    def test_detect_poetry_with_lock(self, tmp_path, monkeypatch, create_full_mcp_server_mod):
         """Test Poetry detection with poetry.lock file"""
         monkeypatch.chdir(tmp_path)
         (tmp_path / "poetry.lock").touch()
 
-        result = detect_environment()
+        result = create_full_mcp_server_mod.detect_environment()
         assert result == ["poetry", "run", "python"]
 
-    def test_detect_pipenv_with_pipfile(self, tmp_path, monkeypatch):
+    def test_detect_pipenv_with_pipfile(self, tmp_path, monkeypatch, create_full_mcp_server_mod):
         """Test Pipenv detection with Pipfile"""
         monkeypatch.chdir(tmp_path)
         (tmp_path / "Pipfile").touch()
 
-        result = detect_environment()
+        result = create_full_mcp_server_mod.detect_environment()
         assert result == ["pipenv", "run", "python"]
 
-    def test_detect_system_python(self, tmp_path, monkeypatch):
+    def test_detect_system_python(self, tmp_path, monkeypatch, create_full_mcp_server_mod):
         """Test default to system Python"""
         monkeypatch.chdir(tmp_path)
 
-        result = detect_environment()
+        result = create_full_mcp_server_mod.detect_environment()
         assert result == ["python"]
 
 
 class TestRunPhase:
     """Test workflow phase execution"""
 
-    @patch("subprocess.run")
-    def test_run_phase_success(self, mock_run):
+    def test_run_phase_success(self, fp, create_full_mcp_server_mod):
         """Test successful phase execution"""
-        mock_run.return_value = MagicMock(returncode=0)
+        recorder = fp.register(["echo", "test"], returncode=0)
 
-        run_phase("Test Phase", ["echo", "test"])
+        create_full_mcp_server_mod.run_phase("Test Phase", ["echo", "test"])
 
-        mock_run.assert_called_once_with(["echo", "test"], cwd=None)
+        assert len(recorder.calls) == 1
+        assert recorder.calls[0].kwargs.get("cwd") is None
 
-    @patch("subprocess.run")
-    def test_run_phase_failure(self, mock_run):
+    def test_run_phase_failure(self, fp, create_full_mcp_server_mod):
         """Test phase failure handling"""
-        mock_run.return_value = MagicMock(returncode=1)
+        fp.register(["false"], returncode=1)
 
         with pytest.raises(SystemExit) as exc_info:
-            run_phase("Test Phase", ["false"])
+            create_full_mcp_server_mod.run_phase("Test Phase", ["false"])
 
         assert exc_info.value.code == 1
 
-    @patch("subprocess.run")
-    def test_run_phase_with_cwd(self, mock_run, tmp_path):
+    def test_run_phase_with_cwd(self, fp, tmp_path, create_full_mcp_server_mod):
         """Test phase execution with custom working directory"""
-        mock_run.return_value = MagicMock(returncode=0)
+        recorder = fp.register(["echo", "test"], returncode=0)
 
-        run_phase("Test Phase", ["echo", "test"], cwd=tmp_path)
+        create_full_mcp_server_mod.run_phase("Test Phase", ["echo", "test"], cwd=tmp_path)
 
-        mock_run.assert_called_once_with(["echo", "test"], cwd=tmp_path)
+        assert len(recorder.calls) == 1
+        assert recorder.calls[0].kwargs["cwd"] == tmp_path
 
 
 class TestCreateMcpConfigTemplate:
     """Test MCP configuration template creation"""
 
-    def test_create_config_template(self, tmp_path):
+    def test_create_config_template(self, tmp_path, create_full_mcp_server_mod):
         """Test creation of MCP configuration templates"""
         module_name = "requests"
         server_dir = tmp_path / "requests_mcp_server"
@@ -96,7 +98,7 @@ class TestCreateMcpConfigTemplate:
         api_db = tmp_path / "requests_api.db"
         api_db.touch()
 
-        mcp_template, settings_template = create_mcp_config_template(
+        mcp_template, settings_template = create_full_mcp_server_mod.create_mcp_config_template(
             module_name, server_dir, api_db
         )
 
@@ -105,40 +107,26 @@ class TestCreateMcpConfigTemplate:
         assert settings_template.exists()
 
         # Verify MCP config content
-        with open(mcp_template) as f:
-            mcp_config = json.load(f)
+        mcp_config = json.loads(mcp_template.read_text())
 
         assert "mcpServers" in mcp_config
         assert f"{module_name}-introspection" in mcp_config["mcpServers"]
 
         server_config = mcp_config["mcpServers"][f"{module_name}-introspection"]
-        assert server_config["type"] == "stdio"
-        assert server_config["command"] == "uv"
+        assert {"type": "stdio", "command": "uv"}.items() <= server_config.items()
         assert "server.py" in server_config["args"]
 
         # Verify settings content
-        with open(settings_template) as f:
-            settings = json.load(f)
+        settings = json.loads(settings_template.read_text())
 
         assert "permissions" in settings
         assert "allow" in settings["permissions"]
 
         # Check all 8 tools are listed
-        expected_tools = [
-            "search_api",
-            "get_class_info",
-            "get_function_info",
-            "list_classes",
-            "list_functions",
-            "get_parameters",
-            "find_examples",
-            "get_related",
-        ]
-        for tool in expected_tools:
-            tool_permission = f"mcp__{module_name}-introspection__{tool}"
-            assert tool_permission in settings["permissions"]["allow"]
-
-    def test_config_paths_are_absolute(self, tmp_path):
+        expected = {f"mcp__{module_name}-introspection__{tool}" for tool in _EXPECTED_TOOLS}
+        assert expected.issubset(settings["permissions"]["allow"])
+
+    def test_config_paths_are_absolute(self, tmp_path, create_full_mcp_server_mod):
         """Test that paths in configuration are absolute"""
         module_name = "test_module"
         server_dir = tmp_path / "test_mcp_server"
@@ -146,200 +134,106 @@ class TestCreateMcpConfigTemplate:
         api_db = tmp_path / "test_api.db"
         api_db.touch()
 
-        mcp_template, _ = create_mcp_config_template(module_name, server_dir, api_db)
+        mcp_template, _ = create_full_mcp_server_mod.create_mcp_config_template(
+            module_name, server_dir, api_db
+        )
 
-        with open(mcp_template) as f:
-            mcp_config = json.load(f)
+        mcp_config = json.loads(mcp_template.read_text())
 
         server_config = mcp_config["mcpServers"][f"{module_name}-introspection"]
 
         # Check paths are absolute
-        assert Path(server_config["cwd"]).is_absolute()
-        assert Path(server_config["env"]["PYTHONPATH"]).is_absolute()
-        assert Path(server_config["env"]["DB_PATH"]).is_absolute()
-
+        env = server_config["env"]
+        paths = [server_config["cwd"], env["PYTHONPATH"], env["DB_PATH"]]
+        assert all(Path(p).is_absolute() for p in paths), paths
 
-class TestMain:
-    """Tests for main() function"""
 
-    @patch("sys.argv", ["create_full_mcp_server.py", "test_module"])
-    @patch("create_full_mcp_server.run_phase")
-    @patch("create_full_mcp_server.create_mcp_config_template")
-    @patch("create_full_mcp_server.detect_environment")
-    def test_main_success_workflow(
-        self, mock_detect_env, mock_create_config, mock_run_phase, tmp_path, monkeypatch
-    ):
-        """Test successful main() execution"""
-        from create_full_mcp_server import main
+def _assert_phase_paths(calls, module):
+    """Check that each phase command points at the module's output paths"""
+    # Phase 1: introspection, Phase 2: database, Phase 3: server
+    assert any(f"{module}_introspection.json" in str(arg) for arg in calls[0])
+    assert any(f"{module}_api.db" in str(arg) for arg in calls[1])
+    assert any(f"{module}_mcp_server" in str(arg) for arg in calls[2])
 
-        monkeypatch.chdir(tmp_path)
-
-        # Create skill directory structure
-        skill_dir = tmp_path / ".claude" / "skills" / "create-introspect-mcp" / "scripts"
-        skill_dir.mkdir(parents=True)
-
-        # Create mock files
-        api_db = tmp_path / "test_module_api.db"
-        api_db.write_text("")
-        server_dir = tmp_path / "test_module_mcp_server"
-        server_dir.mkdir()
-
-        # Setup mocks
-        mock_detect_env.return_value = ["python"]
-        mock_create_config.return_value = (
-            server_dir / "mcp.json.template",
-            server_dir / "settings.local.json.template",
-        )
-        # Create the template files
-        (server_dir / "mcp.json.template").write_text("{}")
-        (server_dir / "settings.local.json.template").write_text("{}")
 
-        # Run main
-        main()
+@pytest.fixture(scope="class")
+def _main_layout(tmp_path_factory):
+    """Create the project layout main() expects, shared by TestMain"""
+    root = tmp_path_factory.mktemp("main")
 
-        # Verify run_phase was called 3 times (introspection, database, server)
-        assert mock_run_phase.call_count == 3
-        assert mock_create_config.call_count == 1
+    # Create skill directory structure
+    (root / ".claude" / "skills" / "create-introspect-mcp" / "scripts").mkdir(parents=True)
 
-    @patch("sys.argv", ["create_full_mcp_server.py", "test_module"])
-    def test_main_missing_skill_directory(self, tmp_path, monkeypatch):
-        """Test main() fails when skill directory doesn't exist"""
-        from create_full_mcp_server import main
+    # main() reports the database size, so only the api_db has to exist; the
+    # server dir and config templates are never touched with the phases faked
+    (root / "test_module_api.db").touch()
 
-        monkeypatch.chdir(tmp_path)
+    return root
 
-        # Don't create skill directory - should fail
-        with pytest.raises(SystemExit) as exc_info:
-            main()
 
-        assert exc_info.value.code == 1
+class TestMain:
+    """Tests for main() function"""
 
-    @patch("sys.argv", ["create_full_mcp_server.py", "test_module", "--max-depth", "5"])
-    @patch("create_full_mcp_server.run_phase")
-    @patch("create_full_mcp_server.create_mcp_config_template")
-    @patch("create_full_mcp_server.detect_environment")
-    def test_main_with_max_depth_argument(
-        self, mock_detect_env, mock_create_config, mock_run_phase, tmp_path, monkeypatch
+    @pytest.fixture
+    def main_env(self, argv, _main_layout, monkeypatch):
+        """Run from the shared layout and return the server dir for the module in argv"""
+        monkeypatch.chdir(_main_layout)
+        return _main_layout / f"{argv[0]}_mcp_server"
+
+    @pytest.mark.parametrize(
+        "argv, phase_index, expected_arg",
+        [
+            # The module name is passed to the introspection command
+            (["test_module"], 0, "test_module"),
+            # --max-depth is passed to the introspection command
+            (["test_module", "--max-depth", "5"], 0, "5"),
+            # --verbose is passed to the database command
+            (["test_module", "--verbose"], 1, "--verbose"),
+        ],
+        ids=["success_workflow", "max_depth", "verbose"],
+    )
+    def test_main_variants(
+        self, argv, phase_index, expected_arg, main_env, fp, monkeypatch, create_full_mcp_server_mod
     ):
-        """Test main() with --max-depth argument"""
-        from create_full_mcp_server import main
-
-        monkeypatch.chdir(tmp_path)
-
-        # Create skill directory
-        skill_dir = tmp_path / ".claude" / "skills" / "create-introspect-mcp" / "scripts"
-        skill_dir.mkdir(parents=True)
-
-        # Create mock files
-        api_db = tmp_path / "test_module_api.db"
-        api_db.write_text("")
-        server_dir = tmp_path / "test_module_mcp_server"
-        server_dir.mkdir()
+        """Test main() with different command-line arguments"""
+        server_dir = main_env
 
         # Setup mocks
-        mock_detect_env.return_value = ["python"]
-        mock_create_config.return_value = (
-            server_dir / "mcp.json.template",
-            server_dir / "settings.local.json.template",
+        fp.register(["python", fp.any()], occurrences=3)
+        mock_create_config = MagicMock(
+            return_value=(
+                server_dir / "mcp.json.template",
+                server_dir / "settings.local.json.template",
+            )
         )
-        (server_dir / "mcp.json.template").write_text("{}")
-        (server_dir / "settings.local.json.template").write_text("{}")
-
-        # Run main
-        main()
-
-        # Verify max-depth was passed to introspection command
-        introspect_call = mock_run_phase.call_args_list[0]
-        cmd = introspect_call[0][1]
-        assert "5" in cmd
-
-    @patch("sys.argv", ["create_full_mcp_server.py", "test_module", "--verbose"])
-    @patch("create_full_mcp_server.run_phase")
-    @patch("create_full_mcp_server.create_mcp_config_template")
-    @patch("create_full_mcp_server.detect_environment")
-    def test_main_with_verbose_flag(
-        self, mock_detect_env, mock_create_config, mock_run_phase, tmp_path, monkeypatch
-    ):
-        """Test main() with --verbose flag"""
-        from create_full_mcp_server import main
-
-        monkeypatch.chdir(tmp_path)
-
-        # Create skill directory
-        skill_dir = tmp_path / ".claude" / "skills" / "create-introspect-mcp" / "scripts"
-        skill_dir.mkdir(parents=True)
-
-        # Create mock files
-        api_db = tmp_path / "test_module_api.db"
-        api_db.write_text("")
-        server_dir = tmp_path / "test_module_mcp_server"
-        server_dir.mkdir()
-
-        # Setup mocks
-        mock_detect_env.return_value = ["python"]
-        mock_create_config.return_value = (
-            server_dir / "mcp.json.template",
-            server_dir / "settings.local.json.template",
+        monkeypatch.setattr(
+            create_full_mcp_server_mod, "create_mcp_config_template", mock_create_config
         )
-        (server_dir / "mcp.json.template").write_text("{}")
-        (server_dir / "settings.local.json.template").write_text("{}")
-
-        # Run main
-        main()
-
-        # Verify --verbose was passed to database command
-        db_call = mock_run_phase.call_args_list[1]
-        cmd = db_call[0][1]
-        assert "--verbose" in cmd
-
-    @patch("sys.argv", ["create_full_mcp_server.py", "requests"])
-    @patch("create_full_mcp_server.run_phase")
-    @patch("create_full_mcp_server.create_mcp_config_template")
-    @patch("create_full_mcp_server.detect_environment")
-    def test_main_creates_all_paths(
-        self, mock_detect_env, mock_create_config, mock_run_phase, tmp_path, monkeypatch
-    ):
-        """Test that main() creates correct paths for all phases"""
-        from create_full_mcp_server import main
-
-        monkeypatch.chdir(tmp_path)
-
-        # Create skill directory
-        skill_dir = tmp_path / ".claude" / "skills" / "create-introspect-mcp" / "scripts"
-        skill_dir.mkdir(parents=True)
-
-        # Create mock files
-        api_db = tmp_path / "requests_api.db"
-        api_db.write_text("")
-        server_dir = tmp_path / "requests_mcp_server"
-        server_dir.mkdir()
-
-        # Setup mocks
-        mock_detect_env.return_value = ["python"]
-        mock_create_config.return_value = (
-            server_dir / "mcp.json.template",
-            server_dir / "settings.local.json.template",
+        monkeypatch.setattr(
+            create_full_mcp_server_mod, "detect_environment", MagicMock(return_value=["python"])
         )
-        (server_dir / "mcp.json.template").write_text("{}")
-        (server_dir / "settings.local.json.template").write_text("{}")
+        monkeypatch.setattr("sys.argv", ["create_full_mcp_server.py", *argv])
 
         # Run main
-        main()
+        create_full_mcp_server_mod.main()
 
-        # Verify paths in calls
-        phase_calls = mock_run_phase.call_args_list
+        assert mock_create_config.call_count == 1
+        # Every variant runs all 3 phases (introspection, database, server) on the module's paths
+        calls = list(fp.calls)
+        assert len(calls) == 3
+        _assert_phase_paths(calls, argv[0])
+        assert expected_arg in calls[phase_index]
 
-        # Phase 1: introspection
-        introspect_cmd = phase_calls[0][0][1]
-        assert any("requests_introspection.json" in str(arg) for arg in introspect_cmd)
+    def test_main_missing_skill_directory(self, tmp_path, monkeypatch, create_full_mcp_server_mod):
+        """Test main() fails when skill directory doesn't exist"""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.argv", ["create_full_mcp_server.py", "test_module"])
 
-        # Phase 2: database
-        db_cmd = phase_calls[1][0][1]
-        assert any("requests_api.db" in str(arg) for arg in db_cmd)
+        # Don't create skill directory - should fail
+        with pytest.raises(SystemExit) as exc_info:
+            create_full_mcp_server_mod.main()
 
-        # Phase 3: server
-        server_cmd = phase_calls[2][0][1]
-        assert any("requests_mcp_server" in str(arg) for arg in server_cmd)
+        assert exc_info.value.code == 1
 
 
 class TestIntegration:
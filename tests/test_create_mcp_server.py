@@ -1,8 +1,22 @@
 """Tests for create_mcp_server.py script."""
 
+import re
+
 import pytest
 
-from src.scripts.create_mcp_server import create_mcp_server, get_database_stats
+from src.scripts.create_mcp_server import get_database_stats
+
+# Tool functions every generated server.py defines
+_EXPECTED_FNS = (
+    "search_api",
+    "get_class_info",
+    "get_function_info",
+    "list_classes",
+    "list_functions",
+    "get_parameters",
+    "find_examples",
+    "get_related",
+)
 
 
 class TestGetDatabaseStats:
@@ -29,60 +43,34 @@ class TestCreateMCPServer:
     """Tests for create_mcp_server function."""
 
     @pytest.mark.integration
-    def test_create_server_files(self, temp_dir, sample_database):
+    def test_create_server_files(self, generated_server):
         """Test that all server files are created."""
-        output_dir = temp_dir / "mcp_server"
-        output_dir.mkdir()
-
-        create_mcp_server("test_module", str(sample_database), str(output_dir))
-
         # Check that files were created
-        assert (output_dir / "server.py").exists()
-        assert (output_dir / "pyproject.toml").exists()
-        assert (output_dir / "README.md").exists()
+        assert (generated_server / "server.py").exists()
+        assert (generated_server / "pyproject.toml").exists()
+        assert (generated_server / "README.md").exists()
 
     @pytest.mark.integration
-    def test_server_py_is_executable(self, temp_dir, sample_database):
+    def test_server_py_is_executable(self, generated_server):
         """Test that server.py has executable permissions."""
-        output_dir = temp_dir / "mcp_server"
-        output_dir.mkdir()
-
-        create_mcp_server("test_module", str(sample_database), str(output_dir))
-
-        server_file = output_dir / "server.py"
+        server_file = generated_server / "server.py"
         assert server_file.exists()
         # Check executable bit
         assert server_file.stat().st_mode & 0o111  # Any execute bit set
 
     @pytest.mark.integration
-    def test_server_py_has_required_functions(self, temp_dir, sample_database):
+    def test_server_py_has_required_functions(self, generated_server):
         """Test that generated server.py has required functions."""
-        output_dir = temp_dir / "mcp_server"
-        output_dir.mkdir()
-
-        create_mcp_server("test_module", str(sample_database), str(output_dir))
-
-        server_content = (output_dir / "server.py").read_text()
+        server_content = (generated_server / "server.py").read_text()
 
         # Check for required functions
-        assert "def search_api" in server_content
-        assert "def get_class_info" in server_content
-        assert "def get_function_info" in server_content
-        assert "def list_classes" in server_content
-        assert "def list_functions" in server_content
-        assert "def get_parameters" in server_content
-        assert "def find_examples" in server_content
-        assert "def get_related" in server_content
+        defined = set(re.findall(r"^def (\w+)\(", server_content, re.MULTILINE))
+        assert set(_EXPECTED_FNS).issubset(defined)
 
     @pytest.mark.integration
-    def test_readme_contains_stats(self, temp_dir, sample_database):
+    def test_readme_contains_stats(self, generated_server):
         """Test that README contains database statistics."""
-        output_dir = temp_dir / "mcp_server"
-        output_dir.mkdir()
-
-        create_mcp_server("test_module", str(sample_database), str(output_dir))
-
-        readme_content = (output_dir / "README.md").read_text()
+        readme_content = (generated_server / "README.md").read_text()
 
         # Check for stats in README (with markdown bold formatting)
         assert "**Classes**:" in readme_content
@@ -90,14 +78,9 @@ class TestCreateMCPServer:
         assert "**Methods**:" in readme_content
 
     @pytest.mark.integration
-    def test_pyproject_toml_valid(self, temp_dir, sample_database):
+    def test_pyproject_toml_valid(self, generated_server):
         """Test that pyproject.toml is valid TOML."""
-        output_dir = temp_dir / "mcp_server"
-        output_dir.mkdir()
-
-        create_mcp_server("test_module", str(sample_database), str(output_dir))
-
-        pyproject_file = output_dir / "pyproject.toml"
+        pyproject_file = generated_server / "pyproject.toml"
         content = pyproject_file.read_text()
 
         # Basic check that it looks like valid TOML
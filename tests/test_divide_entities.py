@@ -3,122 +3,36 @@ Tests for divide_entities.py
 """
 
 import json
-import sqlite3
-import sys
-from pathlib import Path
-from unittest.mock import patch
+import random
 
 import pytest
+from divide_entities import divide_entities, export_entities, main
 
-# Import the module
-sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "scripts"))
-from divide_entities import divide_entities, export_entities
+# Entities for the division tests; slice for smaller inputs (divide_entities doesn't mutate)
+ENTITIES = [{"id": i, "name": f"entity{i}"} for i in range(100)]
 
 
 class TestExportEntities:
     """Test entity export from database"""
 
-    def test_export_entities_empty_database(self, tmp_path):
+    @pytest.mark.parametrize("seed_db_uri", ["empty"], indirect=True)
+    def test_export_entities_empty_database(self, seed_db_uri):
         """Test exporting from empty database"""
-        db_path = tmp_path / "test.db"
-        conn = sqlite3.connect(str(db_path))
-
-        # Create schema
-        conn.execute("""
-            CREATE TABLE classes (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE functions (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        conn.commit()
-        conn.close()
-
-        entities = export_entities(str(db_path))
+        entities = export_entities(seed_db_uri, uri=True)
         assert entities == []
 
-    def test_export_entities_with_data(self, tmp_path):
+    @pytest.mark.parametrize("seed_db_uri", ["small"], indirect=True)
+    def test_export_entities_with_data(self, seed_db_uri):
         """Test exporting entities with data"""
-        db_path = tmp_path / "test.db"
-        conn = sqlite3.connect(str(db_path))
-
-        # Create schema
-        conn.execute("""
-            CREATE TABLE classes (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE functions (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-
-        # Insert test data
-        conn.execute(
-            "INSERT INTO classes (name, full_qualified_name) VALUES (?, ?)",
-            ("TestClass", "module.TestClass"),
-        )
-        conn.execute(
-            "INSERT INTO functions (name, full_qualified_name) VALUES (?, ?)",
-            ("test_func", "module.test_func"),
-        )
-        conn.commit()
-        conn.close()
-
-        entities = export_entities(str(db_path))
+        entities = export_entities(seed_db_uri, uri=True)
 
         assert len(entities) == 2
         assert any(e["type"] == "CLASS" and e["name"] == "TestClass" for e in entities)
         assert any(e["type"] == "FUNCTION" and e["name"] == "test_func" for e in entities)
 
-    def test_export_entities_with_multiple_items(self, tmp_path):
+    def test_export_entities_with_multiple_items(self, seed_db_uri):
         """Test exporting multiple classes and functions"""
-        db_path = tmp_path / "test.db"
-        conn = sqlite3.connect(str(db_path))
-
-        # Create schema
-        conn.execute("""
-            CREATE TABLE classes (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE functions (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-
-        # Insert multiple items
-        for i in range(5):
-            conn.execute(
-                "INSERT INTO classes (name, full_qualified_name) VALUES (?, ?)",
-                (f"Class{i}", f"module.Class{i}"),
-            )
-            conn.execute(
-                "INSERT INTO functions (name, full_qualified_name) VALUES (?, ?)",
-                (f"func{i}", f"module.func{i}"),
-            )
-
-        conn.commit()
-        conn.close()
-
-        entities = export_entities(str(db_path))
+        entities = export_entities(seed_db_uri, uri=True)
 
         assert len(entities) == 10
         # Check all have required fields
@@ -152,7 +66,7 @@ class TestDivideEntities:
 
     def test_divide_even_distribution(self):
         """Test even distribution of entities"""
-        entities = [{"id": i, "name": f"entity{i}"} for i in range(100)]
+        entities = ENTITIES
         groups = divide_entities(entities, num_groups=10)
 
         assert len(groups) == 10
@@ -161,7 +75,7 @@ class TestDivideEntities:
 
     def test_divide_uneven_distribution(self):
         """Test distribution with remainder"""
-        entities = [{"id": i, "name": f"entity{i}"} for i in range(95)]
+        entities = ENTITIES[:95]
         groups = divide_entities(entities, num_groups=10)
 
         assert len(groups) == 10
@@ -175,7 +89,7 @@ class TestDivideEntities:
 
     def test_divide_fewer_entities_than_groups(self):
         """Test when there are fewer entities than groups"""
-        entities = [{"id": i, "name": f"entity{i}"} for i in range(5)]
+        entities = ENTITIES[:5]
         groups = divide_entities(entities, num_groups=10)
 
         assert len(groups) == 10
@@ -189,7 +103,7 @@ class TestDivideEntities:
 
     def test_divide_reproducibility(self):
         """Test that division is reproducible with same seed"""
-        entities = [{"id": i, "name": f"entity{i}"} for i in range(50)]
+        entities = ENTITIES[:50]
 
         groups1 = divide_entities(entities, num_groups=10)
         groups2 = divide_entities(entities, num_groups=10)
@@ -198,9 +112,28 @@ class TestDivideEntities:
         for g1, g2 in zip(groups1, groups2, strict=True):
             assert g1 == g2
 
+    def test_divide_preserves_global_random_state(self):
+        """Test that dividing doesn't reseed the global random module"""
+        state = random.getstate()
+        divide_entities(ENTITIES, num_groups=10)
+
+        assert random.getstate() == state
+
+    def test_divide_weighted_balance(self):
+        """Test that weighted division keeps group totals within one entity's weight"""
+        rng = random.Random(0)
+        entities = [{"id": i, "weight": rng.randint(1, 50)} for i in range(95)]
+        groups = divide_entities(entities, num_groups=10, weight_key="weight")
+
+        assert len(groups) == 10
+        assert sum(len(g) for g in groups) == 95
+
+        sums = [sum(e["weight"] for e in g) for g in groups]
+        assert max(sums) - min(sums) <= max(e["weight"] for e in entities)
+
     def test_divide_single_group(self):
         """Test division into a single group"""
-        entities = [{"id": i, "name": f"entity{i}"} for i in range(20)]
+        entities = ENTITIES[:20]
         groups = divide_entities(entities, num_groups=1)
 
         assert len(groups) == 1
@@ -210,125 +143,52 @@ class TestDivideEntities:
 class TestMain:
     """Tests for main() function"""
 
-    @patch("sys.argv", ["divide_entities.py", "test.db"])
-    def test_main_success(self, tmp_path, monkeypatch):
+    def test_main_success(self, tmp_path, monkeypatch, seed_db):
         """Test successful main() execution"""
-        from divide_entities import main
-
         monkeypatch.chdir(tmp_path)
-
-        # Create test database
-        db_path = tmp_path / "test.db"
-        conn = sqlite3.connect(str(db_path))
-        conn.execute("""
-            CREATE TABLE classes (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE functions (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        for i in range(10):
-            conn.execute(
-                "INSERT INTO classes (name, full_qualified_name) VALUES (?, ?)",
-                (f"Class{i}", f"module.Class{i}"),
-            )
-        conn.commit()
-        conn.close()
+        # Write into tmp_path rather than the shared /tmp default
+        monkeypatch.setattr(
+            "sys.argv", ["divide_entities.py", "test.db", "--output-dir", str(tmp_path)]
+        )
 
         # Run main
         result = main()
 
         assert result == 0
-        # Verify files were created in /tmp
-        assert Path("/tmp/entity_group_1.json").exists()
+        # Verify the written group matches what divide_entities produces
+        expected = divide_entities(export_entities(str(seed_db)), num_groups=10)[0]
+        assert json.loads((tmp_path / "entity_group_1.json").read_text()) == expected
 
-    @patch("sys.argv", ["divide_entities.py", "nonexistent.db"])
-    def test_main_database_not_found(self):
+    def test_main_database_not_found(self, monkeypatch):
         """Test main() with nonexistent database"""
-        from divide_entities import main
-
+        monkeypatch.setattr("sys.argv", ["divide_entities.py", "nonexistent.db"])
         result = main()
 
         assert result == 1
 
-    @patch("sys.argv", ["divide_entities.py", "test.db", "--groups", "5"])
-    def test_main_with_groups_argument(self, tmp_path, monkeypatch):
+    def test_main_with_groups_argument(self, tmp_path, monkeypatch, seed_db):
         """Test main() with custom number of groups"""
-        from divide_entities import main
-
         monkeypatch.chdir(tmp_path)
-
-        # Create test database
-        db_path = tmp_path / "test.db"
-        conn = sqlite3.connect(str(db_path))
-        conn.execute("""
-            CREATE TABLE classes (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE functions (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        for i in range(15):
-            conn.execute(
-                "INSERT INTO functions (name, full_qualified_name) VALUES (?, ?)",
-                (f"func{i}", f"module.func{i}"),
-            )
-        conn.commit()
-        conn.close()
+        monkeypatch.setattr(
+            "sys.argv",
+            ["divide_entities.py", "test.db", "--groups", "5", "--output-dir", str(tmp_path)],
+        )
 
         # Run main with 5 groups
         result = main()
 
         assert result == 0
-        # Verify 5 group files were created
-        for i in range(1, 6):
-            assert Path(f"/tmp/entity_group_{i}.json").exists()
+        # Verify each of the 5 group files holds the matching group
+        expected = divide_entities(export_entities(str(seed_db)), num_groups=5)
+        for i, group in enumerate(expected, 1):
+            assert json.loads((tmp_path / f"entity_group_{i}.json").read_text()) == group
 
-    @patch("sys.argv", ["divide_entities.py", "test.db", "--output-dir", "custom_output"])
-    def test_main_with_custom_output_dir(self, tmp_path, monkeypatch):
+    def test_main_with_custom_output_dir(self, tmp_path, monkeypatch, seed_db):
         """Test main() with custom output directory"""
-        from divide_entities import main
-
         monkeypatch.chdir(tmp_path)
-
-        # Create test database
-        db_path = tmp_path / "test.db"
-        conn = sqlite3.connect(str(db_path))
-        conn.execute("""
-            CREATE TABLE classes (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE functions (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        for i in range(20):
-            conn.execute(
-                "INSERT INTO classes (name, full_qualified_name) VALUES (?, ?)",
-                (f"Class{i}", f"module.Class{i}"),
-            )
-        conn.commit()
-        conn.close()
+        monkeypatch.setattr(
+            "sys.argv", ["divide_entities.py", "test.db", "--output-dir", "custom_output"]
+        )
 
         # Create custom output directory
         output_dir = tmp_path / "custom_output"
@@ -341,37 +201,14 @@ class TestMain:
         assert output_dir.exists()
         assert (output_dir / "entity_group_1.json").exists()
 
-    @patch("sys.argv", ["divide_entities.py", "test.db", "--groups", "3", "--output-dir", "out"])
-    def test_main_with_all_arguments(self, tmp_path, monkeypatch, capsys):
+    @pytest.mark.parametrize("seed_db", ["realistic"], indirect=True)
+    def test_main_with_all_arguments(self, tmp_path, monkeypatch, capsys, seed_db):
         """Test main() with all arguments"""
-        from divide_entities import main
-
         monkeypatch.chdir(tmp_path)
-
-        # Create test database
-        db_path = tmp_path / "test.db"
-        conn = sqlite3.connect(str(db_path))
-        conn.execute("""
-            CREATE TABLE classes (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE functions (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        for i in range(30):
-            conn.execute(
-                "INSERT INTO functions (name, full_qualified_name) VALUES (?, ?)",
-                (f"func{i}", f"module.func{i}"),
-            )
-        conn.commit()
-        conn.close()
+        monkeypatch.setattr(
+            "sys.argv",
+            ["divide_entities.py", "test.db", "--groups", "3", "--output-dir", "out"],
+        )
 
         # Create output directory
         output_dir = tmp_path / "out"
@@ -383,9 +220,9 @@ class TestMain:
 
         # Verify output messages
         captured = capsys.readouterr()
-        assert "Found 30 entities" in captured.out
+        assert "Found 221 entities" in captured.out
         assert "Dividing into 3 groups" in captured.out
-        assert "Total entities: 30" in captured.out
+        assert "Total entities: 221" in captured.out
 
         # Verify files
         for i in range(1, 4):
@@ -397,45 +234,11 @@ class TestIntegration:
     """Integration tests for divide_entities script"""
 
     @pytest.mark.integration
-    def test_full_workflow(self, tmp_path):
+    @pytest.mark.parametrize("seed_db", ["realistic"], indirect=True)
+    def test_full_workflow(self, seed_db):
         """Test complete export and divide workflow"""
-        # Create database with realistic data
-        db_path = tmp_path / "test.db"
-        conn = sqlite3.connect(str(db_path))
-
-        conn.execute("""
-            CREATE TABLE classes (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE functions (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                full_qualified_name TEXT
-            )
-        """)
-
-        # Insert realistic data
-        for i in range(44):
-            conn.execute(
-                "INSERT INTO classes (name, full_qualified_name) VALUES (?, ?)",
-                (f"Class{i}", f"module.Class{i}"),
-            )
-
-        for i in range(177):
-            conn.execute(
-                "INSERT INTO functions (name, full_qualified_name) VALUES (?, ?)",
-                (f"function{i}", f"module.function{i}"),
-            )
-
-        conn.commit()
-        conn.close()
-
         # Export entities
-        entities = export_entities(str(db_path))
+        entities = export_entities(str(seed_db))
         assert len(entities) == 221  # 44 classes + 177 functions
 
         # Divide into groups
@@ -448,29 +251,3 @@ class TestIntegration:
         # Verify each group has reasonable size (20-23 entities)
         for group in groups:
             assert 20 <= len(group) <= 23
-
-    @pytest.mark.integration
-    def test_write_group_files(self, tmp_path):
-        """Test writing group files to disk"""
-        entities = [{"id": i, "name": f"entity{i}", "type": "CLASS"} for i in range(30)]
-        groups = divide_entities(entities, num_groups=3)
-
-        output_dir = tmp_path / "output"
-        output_dir.mkdir()
-
-        # Write groups to files
-        for i, group in enumerate(groups, 1):
-            filename = output_dir / f"entity_group_{i}.json"
-            with open(filename, "w") as f:
-                json.dump(group, f, indent=2)
-
-        # Verify files were created
-        for i in range(1, 4):
-            filename = output_dir / f"entity_group_{i}.json"
-            assert filename.exists()
-
-            # Verify content
-            with open(filename) as f:
-                data = json.load(f)
-                assert isinstance(data, list)
-                assert len(data) == 10  # 30 entities / 3 groups
@@ -80,12 +80,9 @@ class TestModuleIntrospector:
         result = introspector.format_annotation(int)
         assert result == "int"
 
-    def test_introspect_simple_module(self):
+    def test_introspect_simple_module(self, json_module_info):
         """Test introspecting a simple built-in module."""
-        introspector = ModuleIntrospector(include_private=False, max_depth=1)
-        import json as test_module
-
-        result = introspector.introspect_module(test_module)
+        result = json_module_info
 
         assert result is not None
         assert result.name == "json"
@@ -116,12 +113,9 @@ class TestIntegration:
     """Integration tests for the introspection system."""
 
     @pytest.mark.integration
-    def test_introspect_json_module(self):
+    def test_introspect_json_module(self, json_module_info):
         """Test introspecting the json module."""
-        introspector = ModuleIntrospector(include_private=False, max_depth=1)
-        import json as test_module
-
-        result = introspector.introspect_module(test_module)
+        result = json_module_info
 
         assert result is not None
         assert result.name == "json"
@@ -131,14 +125,10 @@ class TestIntegration:
         assert "loads" in function_names or "dumps" in function_names
 
     @pytest.mark.integration
-    def test_full_introspection_workflow(self, temp_dir):
+    def test_full_introspection_workflow(self, temp_dir, json_module_info):
         """Test complete introspection workflow."""
-        introspector = ModuleIntrospector(include_private=False, max_depth=1)
-
-        # Introspect json module
-        import json as test_module
-
-        result = introspector.introspect_module(test_module)
+        # Introspected json module
+        result = json_module_info
         assert result is not None
 
         # Convert to dict and save
@@ -2,218 +2,163 @@
 Tests for run_with_env.py
 """
 
+import os
+import subprocess
 import sys
+from dataclasses import dataclass, field
 from pathlib import Path
-from unittest.mock import MagicMock, patch
 
 import pytest
-
-# Import the module
-sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "scripts"))
 from run_with_env import detect_environment, run_script
 
 
-class TestDetectEnvironment:
-    """Test environment detection"""
-
-    def test_detect_uv_with_lock(self, tmp_path, monkeypatch):
-        """Test detection of uv via uv.lock"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "uv.lock").touch()
-
-        result = detect_environment()
-        assert result == "uv"
-
-    def test_detect_uv_from_pyproject(self, tmp_path, monkeypatch):
-        """Test detection of uv via pyproject.toml"""
-        monkeypatch.chdir(tmp_path)
-        pyproject = tmp_path / "pyproject.toml"
-        pyproject.write_text("[tool.uv]\ndev-dependencies = []")
+def _touch(dir_: str, name: str):
+    """Create an empty marker file with a single open/close"""
+    os.close(os.open(os.path.join(dir_, name), os.O_CREAT | os.O_WRONLY, 0o644))
 
-        result = detect_environment()
-        assert result == "uv"
 
-    def test_detect_poetry(self, tmp_path, monkeypatch):
-        """Test detection of poetry"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "poetry.lock").touch()
+class FakeResult:
+    """Minimal stand-in for subprocess.CompletedProcess; run_script only reads returncode"""
 
-        result = detect_environment()
-        assert result == "poetry"
+    __slots__ = ("returncode",)
 
-    def test_detect_pipenv(self, tmp_path, monkeypatch):
-        """Test detection of pipenv"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "Pipfile").touch()
+    def __init__(self, returncode: int = 0):
+        self.returncode = returncode
 
-        result = detect_environment()
-        assert result == "pipenv"
 
-    def test_detect_conda_yml(self, tmp_path, monkeypatch):
-        """Test detection of conda via environment.yml"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "environment.yml").touch()
+@dataclass(slots=True)
+class Stubs:
+    """Records what run_script() passed to the stubbed subprocess.run and sys.exit"""
 
-        result = detect_environment()
-        assert result == "conda"
+    returncode: int = 0
+    calls: list[list[str]] = field(default_factory=list)  # cmd of each subprocess.run call
+    cwds: list[Path | None] = field(default_factory=list)
+    exit_codes: list[int | None] = field(default_factory=list)
 
-    def test_detect_conda_yaml(self, tmp_path, monkeypatch):
-        """Test detection of conda via environment.yaml"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "environment.yaml").touch()
 
-        result = detect_environment()
-        assert result == "conda"
+@pytest.fixture
+def stubs(monkeypatch):
+    """Stub out subprocess.run and sys.exit, returning the recorded calls"""
+    recorded = Stubs()
 
-    def test_detect_system_python(self, tmp_path, monkeypatch):
-        """Test fallback to system python"""
-        monkeypatch.chdir(tmp_path)
+    def fake_run(cmd, **kwargs):
+        recorded.calls.append(cmd)
+        recorded.cwds.append(kwargs.get("cwd"))
+        return FakeResult(recorded.returncode)
 
-        result = detect_environment()
-        assert result == "python"
+    def fake_exit(code=None):
+        recorded.exit_codes.append(code)
 
-    def test_priority_uv_over_poetry(self, tmp_path, monkeypatch):
-        """Test that uv takes priority when both exist"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "uv.lock").touch()
-        (tmp_path / "poetry.lock").touch()
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    monkeypatch.setattr(sys, "exit", fake_exit)
+    return recorded
 
-        result = detect_environment()
-        assert result == "uv"
 
-    def test_priority_poetry_over_pipenv(self, tmp_path, monkeypatch):
-        """Test that poetry takes priority over pipenv"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "poetry.lock").touch()
-        (tmp_path / "Pipfile").touch()
+class TestDetectEnvironment:
+    """Test environment detection"""
 
-        result = detect_environment()
-        assert result == "poetry"
+    @pytest.mark.parametrize(
+        "markers, expected",
+        [
+            ([("uv.lock", None)], "uv"),
+            ([("pyproject.toml", "[tool.uv]\ndev-dependencies = []")], "uv"),
+            ([("poetry.lock", None)], "poetry"),
+            ([("Pipfile", None)], "pipenv"),
+            ([("environment.yml", None)], "conda"),
+            ([("environment.yaml", None)], "conda"),
+            ([], "python"),
+            # Priority order when several markers exist
+            ([("uv.lock", None), ("poetry.lock", None)], "uv"),
+            ([("poetry.lock", None), ("Pipfile", None)], "poetry"),
+        ],
+        ids=[
+            "uv_lock",
+            "uv_pyproject",
+            "poetry",
+            "pipenv",
+            "conda_yml",
+            "conda_yaml",
+            "system_python",
+            "uv_over_poetry",
+            "poetry_over_pipenv",
+        ],
+    )
+    def test_detect_environment(self, markers, expected, tmp_path):
+        """Test detection from (name, content) marker files; content None means empty"""
+        for name, content in markers:
+            if content is None:
+                _touch(str(tmp_path), name)
+            else:
+                (tmp_path / name).write_text(content)
+
+        assert detect_environment(tmp_path) == expected
+
+    def test_detect_defaults_to_cwd(self, tmp_path, monkeypatch):
+        """Test that detection looks in the current directory when no root is given"""
+        monkeypatch.chdir(tmp_path)
+        _touch(str(tmp_path), "poetry.lock")
+
+        assert detect_environment() == "poetry"
 
 
 class TestRunScript:
     """Test script execution"""
 
-    @patch("subprocess.run")
-    @patch("sys.exit")
-    def test_run_script_with_uv(self, mock_exit, mock_run, tmp_path, monkeypatch):
-        """Test running script with uv"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "uv.lock").touch()
-
-        mock_run.return_value = MagicMock(returncode=0)
-
-        run_script("test.py", ["--arg", "value"])
-
-        # Verify subprocess.run was called with correct command
-        mock_run.assert_called_once()
-        cmd = mock_run.call_args[0][0]
-        assert cmd == ["uv", "run", "--no-project", "python", "test.py", "--arg", "value"]
-        mock_exit.assert_called_once_with(0)
-
-    @patch("subprocess.run")
-    @patch("sys.exit")
-    def test_run_script_with_poetry(self, mock_exit, mock_run, tmp_path, monkeypatch):
-        """Test running script with poetry"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "poetry.lock").touch()
-
-        mock_run.return_value = MagicMock(returncode=0)
-
-        run_script("test.py", [])
-
-        cmd = mock_run.call_args[0][0]
-        assert cmd == ["poetry", "run", "python", "test.py"]
-        mock_exit.assert_called_once_with(0)
-
-    @patch("subprocess.run")
-    @patch("sys.exit")
-    def test_run_script_with_pipenv(self, mock_exit, mock_run, tmp_path, monkeypatch):
-        """Test running script with pipenv"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "Pipfile").touch()
-
-        mock_run.return_value = MagicMock(returncode=0)
-
-        run_script("test.py", [])
-
-        cmd = mock_run.call_args[0][0]
-        assert cmd == ["pipenv", "run", "python", "test.py"]
-
-    @patch("subprocess.run")
-    @patch("sys.exit")
-    def test_run_script_with_conda(self, mock_exit, mock_run, tmp_path, monkeypatch):
-        """Test running script with conda"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "environment.yml").touch()
-
-        mock_run.return_value = MagicMock(returncode=0)
-
-        run_script("test.py", [])
-
-        cmd = mock_run.call_args[0][0]
-        assert cmd == ["conda", "run", "python", "test.py"]
-
-    @patch("subprocess.run")
-    @patch("sys.exit")
-    def test_run_script_with_system_python(self, mock_exit, mock_run, tmp_path, monkeypatch):
-        """Test running script with system python"""
-        monkeypatch.chdir(tmp_path)
-
-        mock_run.return_value = MagicMock(returncode=0)
-
-        run_script("test.py", ["arg1", "arg2"])
-
-        cmd = mock_run.call_args[0][0]
-        assert cmd == ["python", "test.py", "arg1", "arg2"]
-
-    @patch("subprocess.run")
-    @patch("sys.exit")
-    def test_run_script_with_failure(self, mock_exit, mock_run, tmp_path, monkeypatch):
+    @pytest.mark.parametrize(
+        "marker, expected_prefix",
+        [
+            ("uv.lock", ["uv", "run", "--no-project", "python"]),
+            ("poetry.lock", ["poetry", "run", "python"]),
+            ("Pipfile", ["pipenv", "run", "python"]),
+            ("environment.yml", ["conda", "run", "python"]),
+            (None, ["python"]),
+        ],
+        ids=["uv", "poetry", "pipenv", "conda", "system_python"],
+    )
+    def test_run_script(self, marker, expected_prefix, stubs, tmp_path):
+        """Test running script with each environment manager"""
+        if marker:
+            _touch(str(tmp_path), marker)
+
+        run_script("test.py", ["--arg", "value"], cwd=tmp_path)
+
+        # Verify subprocess.run was called once with correct command, from tmp_path
+        assert stubs.calls == [[*expected_prefix, "test.py", "--arg", "value"]]
+        assert stubs.cwds == [tmp_path]
+        assert stubs.exit_codes == [0]
+
+    def test_run_script_with_failure(self, stubs, tmp_path):
         """Test handling of script failure"""
-        monkeypatch.chdir(tmp_path)
-
-        mock_run.return_value = MagicMock(returncode=1)
+        stubs.returncode = 1
 
-        run_script("test.py", [])
+        run_script("test.py", [], cwd=tmp_path)
 
-        mock_exit.assert_called_once_with(1)
+        assert stubs.exit_codes == [1]
 
-    @patch("subprocess.run")
-    @patch("sys.exit")
-    def test_run_script_with_multiple_args(self, mock_exit, mock_run, tmp_path, monkeypatch):
+    def test_run_script_with_multiple_args(self, stubs, tmp_path):
         """Test running script with multiple arguments"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "uv.lock").touch()
-
-        mock_run.return_value = MagicMock(returncode=0)
+        _touch(str(tmp_path), "uv.lock")
 
         args = ["--output", "result.json", "--verbose", "--max-depth", "3"]
-        run_script("introspect.py", args)
+        run_script("introspect.py", args, cwd=tmp_path)
 
-        cmd = mock_run.call_args[0][0]
-        assert cmd[-5:] == args  # Last 5 elements should be our args
+        assert stubs.calls[0][-5:] == args  # Last 5 elements should be our args
 
 
 class TestIntegration:
     """Integration tests"""
 
     @pytest.mark.integration
-    @patch("subprocess.run")
-    @patch("sys.exit")
-    def test_realistic_introspection_command(self, mock_exit, mock_run, tmp_path, monkeypatch):
+    def test_realistic_introspection_command(self, stubs, tmp_path):
         """Test realistic introspection command"""
-        monkeypatch.chdir(tmp_path)
-        (tmp_path / "uv.lock").touch()
-
-        mock_run.return_value = MagicMock(returncode=0)
+        _touch(str(tmp_path), "uv.lock")
 
         script_path = "scripts/introspect.py"
         args = ["requests", "--output", "requests_data.json"]
 
-        run_script(script_path, args)
+        run_script(script_path, args, cwd=tmp_path)
 
-        cmd = mock_run.call_args[0][0]
+        (cmd,) = stubs.calls
         assert "uv" in cmd
         assert "python" in cmd
         assert script_path in cmd
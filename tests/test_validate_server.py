@@ -1,77 +1,66 @@
 """Tests for validate_server.py script."""
 
+import os
+import signal
+
 import pytest
 
+from src.scripts import validate_server
 from src.scripts.validate_server import ServerValidator
 
 
 class TestServerValidator:
     """Tests for ServerValidator class."""
 
-    def test_initialization(self, sample_server_dir):
+    def test_initialization(self, generated_server):
         """Test ServerValidator initialization."""
-        server_path = sample_server_dir / "server.py"
-        validator = ServerValidator(str(server_path), verbose=False)
+        server_path = generated_server / "server.py"
+        validator = ServerValidator(server_path, verbose=False)
 
         assert validator.server_path == server_path
         assert not validator.verbose
         assert validator.test_results == []
 
     @pytest.mark.integration
-    def test_import_test(self, sample_server_dir):
-        """Test that server can be imported."""
-        server_path = sample_server_dir / "server.py"
-        validator = ServerValidator(str(server_path), verbose=False)
-
-        result = validator.test_import()
-        assert result is True
+    @pytest.mark.parametrize(
+        "method_name",
+        [
+            "test_import",
+            "test_basic_functionality",
+            "test_database_connection",
+            "test_error_handling",
+        ],
+    )
+    def test_validator_method(self, validator, method_name):
+        """Test that each validation check passes against the sample server."""
+        assert getattr(validator, method_name)() is True
 
     @pytest.mark.integration
-    def test_basic_functionality(self, sample_server_dir):
-        """Test basic functionality checks."""
-        server_path = sample_server_dir / "server.py"
-        validator = ServerValidator(str(server_path), verbose=False)
-
-        result = validator.test_basic_functionality()
-        assert result is True
+    def test_database_connection_reused_until_close(self, validator):
+        """Test that the database connection stays open for reuse until closed."""
+        assert validator.test_database_connection() is True
+        conn = validator._db_conn
+        assert conn is not None
 
-    @pytest.mark.integration
-    def test_database_connection(self, sample_server_dir):
-        """Test database connectivity."""
-        server_path = sample_server_dir / "server.py"
-        validator = ServerValidator(str(server_path), verbose=False)
+        assert validator.test_database_connection() is True
+        assert validator._db_conn is conn
 
-        result = validator.test_database_connection()
-        assert result is True
+        validator.close()
+        assert validator._db_conn is None
 
     @pytest.mark.integration
     @pytest.mark.slow
-    def test_query_functions(self, sample_server_dir):
+    def test_query_functions(self, validator):
         """Test query function execution."""
-        server_path = sample_server_dir / "server.py"
-        validator = ServerValidator(str(server_path), verbose=False)
-
         test_queries = ["test", "TestClass", "test_function"]
         result = validator.test_query_functions(test_queries)
         # May not pass all queries depending on test data, but shouldn't crash
         assert result is not None
 
-    @pytest.mark.integration
-    def test_error_handling(self, sample_server_dir):
-        """Test error handling."""
-        server_path = sample_server_dir / "server.py"
-        validator = ServerValidator(str(server_path), verbose=False)
-
-        result = validator.test_error_handling()
-        assert result is True
-
     @pytest.mark.integration
     @pytest.mark.slow
-    def test_run_all_tests(self, sample_server_dir):
+    def test_run_all_tests(self, validator):
         """Test running all validation tests."""
-        server_path = sample_server_dir / "server.py"
-        validator = ServerValidator(str(server_path), verbose=False)
-
         results = validator.run_all_tests()
 
         # Should return a dict with test names as keys
@@ -87,11 +76,8 @@ class TestValidationReporting:
     """Tests for validation reporting functionality."""
 
     @pytest.mark.integration
-    def test_print_summary(self, sample_server_dir, capsys):
+    def test_print_summary(self, validator, capsys):
         """Test that summary is printed correctly."""
-        server_path = sample_server_dir / "server.py"
-        validator = ServerValidator(str(server_path), verbose=False)
-
         test_results = {
             "Test 1": True,
             "Test 2": True,
@@ -113,3 +99,40 @@ class TestValidationReporting:
 
         # Should return False because not all tests passed
         assert result is False
+
+
+class StubProcess:
+    """Stand-in for subprocess.Popen recording how _kill_process reaps it."""
+
+    def __init__(self, pid: int = 4321):
+        self.pid = pid
+        self.communicate_timeouts: list[float | None] = []
+
+    def communicate(self, timeout=None):
+        self.communicate_timeouts.append(timeout)
+        return "", ""
+
+
+class TestKillProcess:
+    """Tests for server process teardown."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("already_exited", [False, True], ids=["running", "already_exited"])
+    def test_kill_process_group(self, monkeypatch, already_exited):
+        """Test that the child's process group is SIGKILLed and the process reaped."""
+        killed = []
+
+        def fake_killpg(pgid, sig):
+            killed.append((pgid, sig))
+            if already_exited:
+                raise ProcessLookupError
+
+        monkeypatch.setattr(validate_server, "IS_UNIX", True)
+        monkeypatch.setattr(os, "getpgid", lambda pid: pid + 1, raising=False)
+        monkeypatch.setattr(os, "killpg", fake_killpg, raising=False)
+        process = StubProcess()
+
+        ServerValidator._kill_process(process)  # ProcessLookupError must not escape
+
+        assert killed == [(process.pid + 1, signal.SIGKILL)]
+        assert process.communicate_timeouts == [1]